@@ -30,6 +30,10 @@ from dms_tools2.plot import COLOR_BLIND_PALETTE_GRAY
 import matplotlib.pyplot as plt
 from plotnine import *
 
+#: type of patterns returned by `regex.compile`, as older versions
+#: of `regex` do not define `regex.Pattern`
+_REGEX_PATTERN = type(regex.compile(''))
+
 
 class CCS:
     """Class to handle results of ``ccs``.
@@ -861,7 +865,7 @@ def matchSeqs(df, match_str, col_to_match, match_col, *,
     Args:
         `df` (pandas DataFrame)
             Data frame with column holding sequences to match.
-        `match_str` (str)
+        `match_str` (str or compiled `regex` pattern)
             A string that can be passed to `regex.compile` that gives
             the pattern that we are looking for, with target 
             subsequences as named groups. See also the `expandIUPAC`
@@ -869,7 +873,13 @@ def matchSeqs(df, match_str, col_to_match, match_col, *,
             If `None` we just return `df`. Note that we use
             `regex` rather than `re`, so fuzzy matching is
             enabled. Note that the matching uses the *BESTMATCH*
-            flag to find the best match.
+            flag to find the best match. Can also be a pattern
+            already returned by `regex.compile`, which avoids
+            re-processing the same pattern on repeated calls. In
+            that case `expandIUPAC` is ignored, so the pattern should
+            already have ambiguous nucleotides expanded, and it must
+            be compiled with the *BESTMATCH* flag. Patterns compiled
+            with the standard library `re` module are not accepted.
         `col_to_match` (str)
             Name of column in `df` that contains the sequences
             to match.
@@ -963,6 +973,22 @@ def matchSeqs(df, match_str, col_to_match, match_col, *,
     >>> (df.sort_index(axis=1) == expected.sort_index(axis=1)).all().all()
     True
 
+    The same match using a pattern that is already compiled:
+
+    >>> matcher = regex.compile(re_expandIUPAC(match_str),
+    ...                         flags=regex.BESTMATCH)
+    >>> df_compiled = matchSeqs(df_in, matcher, 'CCS', 'matched',
+    ...         add_accuracy=False, add_qvals=False)
+    >>> df_compiled.equals(df)
+    True
+
+    Patterns compiled with the standard library `re` are rejected:
+
+    >>> matchSeqs(df_in, re.compile(match_str), 'CCS', 'matched')  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    TypeError: `match_str` must be a str or a pattern compiled with `regex.compile`
+
     Here is a short example with fuzzy matching that uses the
     `remove_indels` option.
     First, do not remove the indels:
@@ -1013,9 +1039,20 @@ def matchSeqs(df, match_str, col_to_match, match_col, *,
     assert col_to_match in df.columns, \
             "`df` lacks `col_to_match` column {0}".format(col_to_match)
 
-    if expandIUPAC:
-        match_str = re_expandIUPAC(match_str)
-    matcher = regex.compile(match_str, flags=regex.BESTMATCH)
+    if isinstance(match_str, str):
+        if expandIUPAC:
+            match_str = re_expandIUPAC(match_str)
+        matcher = regex.compile(match_str, flags=regex.BESTMATCH)
+    elif isinstance(match_str, _REGEX_PATTERN):
+        if not match_str.flags & regex.BESTMATCH:
+            raise ValueError("compiled `match_str` must use the "
+                             "`regex.BESTMATCH` flag")
+        matcher = match_str
+        match_str = matcher.pattern
+    else:
+        raise TypeError("`match_str` must be a str or a pattern compiled "
+                        "with `regex.compile`, not {0}".format(
+                        type(match_str)))
 
     newcols = [match_col]
     if add_polarity:
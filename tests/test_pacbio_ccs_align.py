@@ -5,13 +5,17 @@ In the process, also tests `dms_tools2.minimap2`.
 
 from pathlib import Path
 import unittest
+import os
 import collections
-import random
-import subprocess
+import concurrent.futures
 import itertools
+import shutil
+import types
 
 import numpy
 import pandas
+import pysam
+import regex
 from pandas.testing import assert_frame_equal, assert_series_equal
 
 import dms_tools2.pacbio
@@ -20,21 +24,208 @@ from dms_tools2.pacbio import qvalsToAccuracy
 from dms_tools2 import NTS
 
 
-Query = collections.namedtuple('Query', ['name', 'barcoded',
-        'barcode', 'aligned', 'cigar', 'seq', 'qvals', 'accuracy', 
-        'trimmed', 'n_additional', 'target'])
-Query.__doc__ = "Holds queries for simulated alignments."
-
-
-def randSeq(seqlen):
-    """Random nucleotide sequence of length `seqlen`."""
-    return ''.join([random.choice(NTS) for _ in range(seqlen)])
-
-
-class test_pacbio_CCS_align_short_codonDMS(unittest.TestCase):
+#: nucleotides as array that can be indexed by random integer codes
+_NTS_ARR = numpy.array(NTS, dtype='S1')
+
+
+class _NtPool:
+    """Pool of random nucleotide codes drawn in large blocks.
+
+    Drawing one big block and slicing it is much faster than
+    drawing each short sequence separately.
+    """
+
+    def __init__(self, rng, blocksize=2**18):
+        self._rng = rng
+        self._blocksize = blocksize
+        self._codes = numpy.empty(0, dtype='int64')
+        self._offset = 0
+
+    def take(self, n):
+        """Next `n` random codes in `range(len(NTS))`."""
+        if self._offset + n > len(self._codes):
+            self._codes = self._rng.integers(0, len(NTS),
+                                             size=max(n, self._blocksize))
+            self._offset = 0
+        codes = self._codes[self._offset : self._offset + n]
+        self._offset += n
+        return codes
+
+
+#: number of queries simulated together with one set of random number streams
+_QUERY_CHUNK = 1000
+
+
+_QuerySettings = collections.namedtuple('_QuerySettings', [
+        'TARGET_LEN', 'MAX_DEL_LEN', 'MAX_INS_LEN', 'DEL_PROB', 'INS_PROB',
+        'INDEL_SPACING', 'NMUTS', 'MUTLEN', 'MUT_BUFFER',
+        'targets', 'flank5', 'flank3', 'bclen'])
+_QuerySettings.__doc__ = "Settings passed to :func:`_simulateQueries`."
+
+
+def randSeq(seqlen, pool):
+    """Random nucleotide sequence of length `seqlen` drawn from `pool`."""
+    return _NTS_ARR[pool.take(seqlen)].tobytes().decode('ascii')
+
+
+def _simulateQueries(settings, start, nqueries, seedseq):
+    """Simulate a chunk of queries for a test configuration.
+
+    Args:
+        `settings` (:class:`_QuerySettings`)
+            Settings, targets, flanking sequences, and barcode length.
+        `start` (int)
+            Index of first query in chunk, used to name queries.
+        `nqueries` (int)
+            Number of queries in chunk.
+        `seedseq` (`numpy.random.SeedSequence`)
+            Seeds the random number generators for the chunk.
+
+    Returns:
+        A dict keyed by column name giving the query properties
+        as lists or numpy arrays.
+    """
+    # seeded generator for sequences and simulation decisions
+    seq_rng = numpy.random.default_rng(seedseq)
+
+    # draw all simulation decisions up front, one row per query
+    ntargets = len(settings.targets)
+    rands = seq_rng.random(nqueries)
+    read_lens = seq_rng.integers(settings.TARGET_LEN // 2, settings.TARGET_LEN * 2 + 1,
+                                 size=nqueries)
+    itargets = seq_rng.integers(0, ntargets, size=(nqueries, 2))
+    (has_del, has_ins, has_additional) = (
+            seq_rng.random(size=(3, nqueries)) <
+            numpy.array([[settings.DEL_PROB], [settings.INS_PROB], [0.2]]))
+    del_lens = seq_rng.integers(1, settings.MAX_DEL_LEN + 1, size=nqueries)
+    ins_lens = seq_rng.integers(1, settings.MAX_INS_LEN + 1, size=nqueries)
+    nmuts = seq_rng.integers(0, settings.NMUTS + 1, size=nqueries)
+    # fractions placing deletion, insertion, and mutations among sites
+    site_fracs = seq_rng.random(size=(nqueries, 2 + settings.NMUTS))
+    mut_nts = numpy.array(NTS)[seq_rng.integers(0, len(NTS),
+            size=(nqueries, settings.NMUTS, settings.MUTLEN))]
+    pool = _NtPool(seq_rng)
+
+    # build each property as a preallocated column
+    names = ['query{0}'.format(start + iquery + 1)
+             for iquery in range(nqueries)]
+    barcoded = numpy.zeros(nqueries, dtype='bool')
+    barcodes = numpy.zeros(nqueries, dtype='S{0}'.format(settings.bclen))
+    aligned = numpy.zeros(nqueries, dtype='bool')
+    cigars = [''] * nqueries
+    seqs = [None] * nqueries
+    trimmed = numpy.zeros(nqueries, dtype='bool')
+    n_additional = numpy.full(nqueries, -1, dtype='int')
+    targets = [''] * nqueries
+
+    # bind names used in the loop to locals
+    target_items = list(settings.targets.items())
+    target_seqs = list(settings.targets.values())
+    mutateSeq = dms_tools2.minimap2.mutateSeq
+    shiftIndels = dms_tools2.minimap2.shiftIndels
+    reverseComplement = dms_tools2.utils.reverseComplement
+
+    for iquery in range(nqueries):
+        rand = rands[iquery]
+        fracs = site_fracs[iquery]
+
+        if rand < 0.1:
+            # should fail matching and aligning
+            if rand < 0.5:
+                seq = randSeq(read_lens[iquery], pool)
+            else:
+                # reverse complement won't match
+                seq = reverseComplement(target_seqs[itargets[iquery, 0]])
+        elif rand < 0.2:
+            # should pass matching, fail aligning
+            barcoded[iquery] = True
+            barcode = randSeq(settings.bclen, pool)
+            barcodes[iquery] = barcode.encode('ascii')
+            seq = ''.join((settings.flank5,
+                           randSeq(read_lens[iquery], pool),
+                           barcode,
+                           settings.flank3,
+                           ))
+
+        else:
+            # should pass matching and aligning
+            barcoded[iquery] = aligned[iquery] = True
+            barcode = randSeq(settings.bclen, pool)
+            barcodes[iquery] = barcode.encode('ascii')
+
+            # get sites eligible for mutating
+            mutsites = numpy.zeros(settings.TARGET_LEN, dtype='bool')
+            mutsites[settings.MUT_BUFFER :
+                     settings.TARGET_LEN - settings.MUT_BUFFER] = True
+
+            deletions = []
+            if has_del[iquery]:
+                del_len = int(del_lens[iquery])
+                # no sites excluded yet, so eligible starts are a range
+                max_i = settings.TARGET_LEN - settings.MUT_BUFFER - 1 - del_len
+                del_start = settings.MUT_BUFFER + int(fracs[0] *
+                                                 (max_i - settings.MUT_BUFFER))
+                deletions.append((del_start, del_len))
+                mutsites[max(0, del_start - settings.INDEL_SPACING) :
+                         del_start + del_len + settings.INDEL_SPACING + 1
+                         ] = False
+
+            insertions = []
+            if has_ins[iquery]:
+                ins = randSeq(ins_lens[iquery], pool)
+                sites = numpy.flatnonzero(mutsites)
+                ins_start = int(sites[int(fracs[1] * len(sites))])
+                insertions.append((ins_start, ins))
+                mutsites[max(0, ins_start - settings.INDEL_SPACING) :
+                         ins_start + settings.INDEL_SPACING + 1] = False
+
+            mutations = []
+            for imut in range(nmuts[iquery]):
+                sites = numpy.flatnonzero(mutsites)
+                i = int(sites[int(fracs[2 + imut] * len(sites))])
+                mutnts = mut_nts[iquery, imut].tolist()
+                for j, nt in zip(range(i, min(i + settings.MUTLEN,
+                                              settings.TARGET_LEN)),
+                                 mutnts):
+                    if mutsites[j]:
+                        mutsites[j] = False
+                        mutations.append((j, nt))
+            (target, targetseq) = target_items[itargets[iquery, 0]]
+            targets[iquery] = target
+            n_additional[iquery] = 0
+            if has_additional[iquery] and not deletions:
+                targetseq2 = target_seqs[itargets[iquery, 1]]
+                targetseq = targetseq + targetseq2[ : settings.TARGET_LEN // 2]
+                n_additional[iquery] = 1
+                trimmed[iquery] = True
+            (read, cigar) = mutateSeq(targetseq,
+                                      mutations, insertions, deletions)
+            cigars[iquery] = shiftIndels(cigar)
+            seq = ''.join((settings.flank5,
+                           read,
+                           barcode,
+                           settings.flank3,
+                           ))
+
+        seqs[iquery] = seq
+
+    return {'names': names,
+            'barcoded': barcoded,
+            'barcodes': barcodes,
+            'aligned': aligned,
+            'cigars': cigars,
+            'seqs': seqs,
+            'trimmed': trimmed,
+            'n_additional': n_additional,
+            'targets': targets,
+            }
+
+
+class test_pacbio_CCS_align(unittest.TestCase):
     """Tests `dms_tools2.pacbio.CCS` and related functions.
-    
-    Data simulates codon-level DMS of a short target."""
+
+    Each test simulates data for one of `CONFIGS`, which override
+    the default settings given by the upper-case attributes."""
 
     #: length of target sequence
     TARGET_LEN = 1000
@@ -72,245 +263,235 @@ class test_pacbio_CCS_align_short_codonDMS(unittest.TestCase):
     #: no mutations within this distance from termini
     MUT_BUFFER = 30
 
-    def setUp(self):
-        """Create target and query, initialize `CCS` object"""
-
-        self.testdir = (Path(__file__).absolute().parent
-                        .joinpath('test_pacbio_ccs_align_files')
-                        .joinpath(self.__class__.__name__)
-                        )
-        Path.mkdir(self.testdir, parents=True, exist_ok=True)
+    #: settings that differ from defaults for each simulated configuration
+    CONFIGS = collections.OrderedDict([
+        # codon-level DMS of a short target
+        ('short_codonDMS', {}),
+        # codon-level DMS of a long target
+        ('long_codonDMS', {
+            'TARGET_LEN': 4000,
+            }),
+        # short viral sequences with some long deletions
+        ('short_virus_w_del', {
+            'MAPPER_OPTIONS': dms_tools2.minimap2.OPTIONS_VIRUS_W_DEL,
+            'MAX_DEL_LEN': 600,
+            'MAX_INS_LEN': 30,
+            'INDEL_SPACING': 50,
+            'MUTLEN': 1,
+            'MUT_BUFFER': 80,
+            }),
+        # long viral sequences with some long deletions
+        ('long_virus_w_del', {
+            'TARGET_LEN': 4000,
+            'MAPPER_OPTIONS': dms_tools2.minimap2.OPTIONS_VIRUS_W_DEL,
+            'MAX_DEL_LEN': 3200,
+            'MAX_INS_LEN': 30,
+            'INDEL_SPACING': 50,
+            'MUTLEN': 1,
+            'MUT_BUFFER': 80,
+            }),
+        ])
+
+    #: compiled `regex` patterns for matching shared by all tests,
+    #: keyed by flanking sequences and barcode length
+    _matcher_cache = {}
+
+    @classmethod
+    def setUpClass(cls):
+        """Create directory for files created by the tests."""
+        cls.testdir = (Path(__file__).absolute().parent
+                       .joinpath('test_pacbio_ccs_align_files'))
+        Path.mkdir(cls.testdir, parents=True, exist_ok=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove files created for the tests."""
+        shutil.rmtree(cls.testdir)
+
+    @classmethod
+    def _simulate(cls, config):
+        """Create target and queries, initialize `CCS` object.
+
+        Args:
+            `config` (str)
+                Key in `CONFIGS` giving settings to simulate.
+
+        Returns:
+            A namespace holding the settings and the simulated data.
+        """
+        params = {key: getattr(cls, key) for key in dir(cls)
+                  if key.isupper() and key != 'CONFIGS'}
+        params.update(cls.CONFIGS[config])
+        sim = types.SimpleNamespace(**params)
+
+        sim.testdir = cls.testdir.joinpath(config)
+        Path.mkdir(sim.testdir, parents=True, exist_ok=True)
+
+        # seeded generator for targets and flanking sequences
+        pool = _NtPool(numpy.random.default_rng(sim.SEED))
 
         # target sequence
-        random.seed(self.SEED)
-        self.targets = {'target{0}'.format(i + 1):randSeq(self.TARGET_LEN)
-                        for i in range(2)}
-        self.targetfile = self.testdir.joinpath('target.fasta')
-        with open(self.targetfile, 'w') as f:
-            f.write('\n'.join('>{0}\n{1}'.format(*tup) for tup
-                    in self.targets.items()))
+        sim.targets = {'target{0}'.format(i + 1):
+                           randSeq(sim.TARGET_LEN, pool)
+                       for i in range(2)}
+        sim.targetfile = sim.testdir.joinpath('target.fasta')
+        with open(sim.targetfile, 'w') as f:
+            f.write('\n'.join(f">{name}\n{seq}" for name, seq
+                    in sim.targets.items()))
 
         # flanking sequences and barcodes
-        self.flank5 = randSeq(20)
-        self.flank3 = randSeq(18)
-        self.bclen = 12
-
-        # create queries
-        self.queries = []
-        for iquery in range(self.NQUERIES):
-            name = 'query{0}'.format(iquery + 1)
-            rand = random.random()
-            barcode = cigar = target = ''
-            n_additional = -1
-            trimmed = barcoded = aligned = False
-
-            if rand < 0.1:
-                # should fail matching and aligning
-                if rand < 0.5:
-                    seq = randSeq(random.randint(self.TARGET_LEN // 2,
-                                                self.TARGET_LEN * 2))
-                else:
-                    # reverse complement won't match
-                    seq = dms_tools2.utils.reverseComplement(
-                            random.choice(list(self.targets.values())))
-            elif rand < 0.2:
-                # should pass matching, fail aligning
-                barcoded = True
-                barcode = randSeq(self.bclen)
-                seq = (self.flank5 + 
-                       randSeq(random.randint(self.TARGET_LEN // 2,
-                                              self.TARGET_LEN * 2)) +
-                       barcode +
-                       self.flank3
-                       )
-
+        sim.flank5 = randSeq(20, pool)
+        sim.flank3 = randSeq(18, pool)
+        sim.bclen = 12
+
+        # create queries in chunks, each with its own random number
+        # streams, simulating chunks in parallel if there is more than
+        # one chunk and more than one CPU
+        settings = _QuerySettings(**{field: getattr(sim, field)
+                                     for field in _QuerySettings._fields})
+        starts = range(0, sim.NQUERIES, _QUERY_CHUNK)
+        sizes = [min(_QUERY_CHUNK, sim.NQUERIES - start) for start in starts]
+        seedseqs = numpy.random.SeedSequence(sim.SEED).spawn(len(starts))
+        settings_list = [settings] * len(starts)
+        ncpus = os.cpu_count() or 1
+        if len(starts) > 1 and ncpus > 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=min(len(starts), ncpus)) as executor:
+                chunks = list(executor.map(_simulateQueries, settings_list,
+                                           starts, sizes, seedseqs))
+        else:
+            chunks = list(map(_simulateQueries, settings_list,
+                              starts, sizes, seedseqs))
+        columns = {}
+        for col in chunks[0]:
+            if isinstance(chunks[0][col], numpy.ndarray):
+                columns[col] = numpy.concatenate([c[col] for c in chunks])
             else:
-                # should pass matching and aligning
-                barcoded = aligned = True
-                barcode = randSeq(self.bclen)
-
-                # get sites eligible for mutating
-                mutsites = list(range(self.MUT_BUFFER,
-                        self.TARGET_LEN - self.MUT_BUFFER))
-
-                deletions = []
-                if random.random() < self.DEL_PROB:
-                    del_len = random.randint(1, self.MAX_DEL_LEN)
-                    max_i = max(mutsites) - del_len
-                    del_start = random.choice([i for i in mutsites
-                            if i < max_i])
-                    deletions.append((del_start, del_len))
-                    mutsites = [i for i in mutsites if
-                            (i < del_start - self.INDEL_SPACING) or
-                            (i > del_start + del_len + self.INDEL_SPACING)]
-
-                insertions = []
-                if random.random() < self.INS_PROB:
-                    ins = randSeq(random.randint(1, self.MAX_INS_LEN))
-                    ins_start = random.choice(mutsites)
-                    insertions.append((ins_start, ins))
-                    mutsites = [i for i in mutsites if
-                            (i < ins_start - self.INDEL_SPACING) or
-                            (i > ins_start + self.INDEL_SPACING)]
-
-                mutations = []
-                for imut in range(random.randint(0, self.NMUTS)):
-                    i = random.choice(mutsites)
-                    for j in range(i, i + self.MUTLEN):
-                        if j in mutsites:
-                            mutsites.remove(j)
-                            mutations.append((j, random.choice(NTS)))
-                (target, targetseq) = random.choice(list(self.targets.items()))
-                n_additional = 0
-                if random.random() < 0.2 and not deletions:
-                    targetseq2 = random.choice(list(self.targets.values()))
-                    targetseq = targetseq + targetseq2[ : self.TARGET_LEN // 2]
-                    n_additional = 1
-                    trimmed = True
-                (read, cigar) = dms_tools2.minimap2.mutateSeq(
-                        targetseq,
-                        mutations, insertions, deletions)
-                seq = (self.flank5 + 
-                       read +
-                       barcode +
-                       self.flank3
-                       )
-
-            qvals = '?' * len(seq)
-            self.queries.append(
-                    Query(name=name, 
-                          barcoded=barcoded,
-                          barcode=barcode,
-                          aligned=aligned, 
-                          cigar=dms_tools2.minimap2.shiftIndels(cigar),
-                          seq=seq,
-                          qvals=qvals,
-                          accuracy=qvalsToAccuracy(qvals, encoding='sanger'),
-                          trimmed=trimmed,
-                          n_additional=n_additional,
-                          target=target))
+                columns[col] = list(itertools.chain.from_iterable(
+                        c[col] for c in chunks))
+        sim.barcodes = columns.pop('barcodes')
+        seqs = columns['seqs']
+
+        # all Q-values are the same, so all queries have same accuracy
+        qval = '?'
+        accuracy = qvalsToAccuracy(qval, encoding='sanger')
+        qvals = [qval * len(seq) for seq in seqs]
+        sim.queries = pandas.DataFrame({
+                'name': columns['names'],
+                'barcoded': columns['barcoded'],
+                'aligned': columns['aligned'],
+                'cigar': columns['cigars'],
+                'seq': seqs,
+                'qvals': qvals,
+                'accuracy': accuracy,
+                'trimmed': columns['trimmed'],
+                'n_additional': columns['n_additional'],
+                'target': columns['targets'],
+                })
 
         # create fasta file of queries
-        with self.testdir.joinpath('queries.fasta').open('w') as f:
-            f.write('\n'.join('>{0}\n{1}'.format(q.name, q.seq)
-                    for q in self.queries))
+        with sim.testdir.joinpath('queries.fasta').open('w') as f:
+            f.write('\n'.join([f">{name}\n{seq}" for name, seq in
+                                zip(sim.queries.name, sim.queries.seq)]))
 
         # create bamfile of queries
-        sam_template = '{0[name]}\t4\t*\t0\t255\t*\t*\t0\t0\t{0[seq]}\t' +\
-                       '{0[qvals]}\tnp:i:6\trq:f:{0[accuracy]}'
-        samfile = self.testdir.joinpath('queries.sam')
-        with open(samfile, 'w') as f:
-            for q in self.queries:
-                f.write(sam_template.format(q._asdict()) + '\n')
-        bamfile = self.testdir.joinpath('queries.bam')
-        _ = subprocess.check_call(['samtools', 'view', '-b', '-o',
-                                   bamfile, samfile])
+        bamfile = sim.testdir.joinpath('queries.bam')
+        with pysam.AlignmentFile(str(bamfile), 'wb',
+                                 header={'HD': {'VN': '1.6',
+                                                'SO': 'unsorted'}}) as f:
+            for q in sim.queries.itertuples(index=False):
+                a = pysam.AlignedSegment()
+                a.query_name = q.name
+                a.flag = 4
+                a.mapping_quality = 255
+                a.query_sequence = q.seq
+                a.query_qualities = pysam.qualitystring_to_array(q.qvals)
+                a.set_tag('np', 6, 'i')
+                a.set_tag('rq', q.accuracy, 'f')
+                f.write(a)
 
         # create CCS object for tests
-        self.ccs = dms_tools2.pacbio.CCS('test', bamfile, reportfile=None)
-
-
-    def test_match_and_align(self):
-        """Tests match and alignment on `CCS`."""
-        # make sure all queries in `CCS` data frame
-        self.assertCountEqual(self.ccs.df.name, [q.name for q in self.queries])
-
-        # now match and check that we get the right entries
-        match_str = self.flank5 + \
-                    '(?P<read>N+)' + \
-                    '(?P<barcode>N{{{0}}})'.format(self.bclen) + \
-                    self.flank3
-        df = dms_tools2.pacbio.matchSeqs(self.ccs.df,
-                match_str, 'CCS', 'barcoded')
-        self.assertCountEqual(df.query('barcoded').barcode,
-                              [q.barcode for q in self.queries if q.barcoded])
+        sim.ccs = dms_tools2.pacbio.CCS('test', bamfile, reportfile=None)
+
+        return sim
+
+    def test_match_and_align_short_codonDMS(self):
+        """Tests match and alignment for short codon-level DMS target."""
+        self._check_match_and_align(self._simulate('short_codonDMS'))
+
+    def test_match_and_align_long_codonDMS(self):
+        """Tests match and alignment for long codon-level DMS target."""
+        self._check_match_and_align(self._simulate('long_codonDMS'))
+
+    def test_match_and_align_short_virus_w_del(self):
+        """Tests match and alignment for short virus with deletions."""
+        self._check_match_and_align(self._simulate('short_virus_w_del'))
+
+    def test_match_and_align_long_virus_w_del(self):
+        """Tests match and alignment for long virus with deletions."""
+        self._check_match_and_align(self._simulate('long_virus_w_del'))
+
+    def _check_match_and_align(self, sim):
+        """Checks match and alignment on `CCS` for simulation `sim`."""
+        # match and check that we get the right entries, in query order
+        match_key = (sim.flank5, sim.bclen, sim.flank3)
+        if match_key not in self._matcher_cache:
+            self._matcher_cache[match_key] = regex.compile(
+                    dms_tools2.pacbio.re_expandIUPAC(
+                        sim.flank5 +
+                        '(?P<read>N+)' +
+                        '(?P<barcode>N{{{0}}})'.format(sim.bclen) +
+                        sim.flank3),
+                    flags=regex.BESTMATCH)
+        df = dms_tools2.pacbio.matchSeqs(sim.ccs.df,
+                self._matcher_cache[match_key], 'CCS', 'barcoded')
+        assert_frame_equal(df[['name', 'barcoded']],
+                           sim.queries[['name', 'barcoded']])
+        self.assertTrue(numpy.array_equal(
+                df.barcode.values.astype(sim.barcodes.dtype),
+                sim.barcodes))
 
         # now align and check that we get the right entries
-        mapper = dms_tools2.minimap2.Mapper(str(self.targetfile),
-                self.MAPPER_OPTIONS)
+        mapper = dms_tools2.minimap2.Mapper(str(sim.targetfile),
+                sim.MAPPER_OPTIONS)
         df = dms_tools2.pacbio.alignSeqs(df,
                 mapper, 'read', 'aligned',
-                paf_file=str(self.testdir.joinpath('alignment.paf')))
-        self.assertCountEqual(df.query('aligned').name,
-                [q.name for q in self.queries if q.aligned])
-        assert_series_equal(df.aligned_target,
-                pandas.Series([q.target for q in self.queries]),
-                check_names=False)
-        self.assertListEqual(
+                paf_file=str(sim.testdir.joinpath('alignment.paf')))
+        assert_frame_equal(
+                df[['name', 'aligned', 'aligned_target',
+                    'aligned_n_additional']],
+                sim.queries[['name', 'aligned', 'target', 'n_additional']]
+                    .rename(columns={'target': 'aligned_target',
+                                     'n_additional': 'aligned_n_additional'}))
+        assert_series_equal(
                     (df.aligned_n_trimmed_query_start.replace(-1, 0) +
                     df.aligned_n_trimmed_query_end.replace(-1, 0) +
                     df.aligned_n_trimmed_target_start.replace(-1, 0) +
                     df.aligned_n_trimmed_target_end.replace(-1, 0)
-                    ).astype('bool').tolist(),
-                [q.trimmed for q in self.queries])
-        assert_series_equal(df.aligned_n_additional,
-                pandas.Series([q.n_additional for q in self.queries]),
+                    ).astype('bool'),
+                sim.queries.trimmed,
                 check_names=False)
-        expected_cigars = dict((q.name, q.cigar) for q in self.queries)
-        for row in df.query('aligned').itertuples():
-            name = getattr(row, 'name')
-            cigar = getattr(row, 'aligned_alignment').cigar_str
-            if not getattr(row, 'aligned_n_additional'):
-                self.assertEqual(expected_cigars[name], cigar)
+        got = df[df.aligned & (df.aligned_n_additional == 0)]
+        got = pandas.DataFrame({
+                'name': got.name,
+                'aligned_cigar': [a.cigar_str for a in got.aligned_alignment],
+                })
+        cigars = sim.queries[['name', 'cigar']].merge(got, on='name',
+                validate='one_to_one')
+        mismatched = cigars[cigars.cigar != cigars.aligned_cigar]
+        self.assertTrue(mismatched.empty,
+                        "mismatched CIGARs:\n{0}".format(mismatched))
 
         # now test the `matchAndAlignCCS` function
-        df2 = dms_tools2.pacbio.matchAndAlignCCS(self.ccs, mapper,
-                termini5=self.flank5, gene='N+', spacer=None, umi=None,
-                barcode='N{{{0}}}'.format(self.bclen), termini3=self.flank3)
+        df2 = dms_tools2.pacbio.matchAndAlignCCS(sim.ccs, mapper,
+                termini5=sim.flank5, gene='N+', spacer=None, umi=None,
+                barcode='N{{{0}}}'.format(sim.bclen), termini3=sim.flank3)
         assert_series_equal(df.aligned, df2.gene_aligned, check_names=False)
         assert_series_equal(df.aligned_target, df2.gene_aligned_target,
                 check_names=False)
         assert_series_equal(df.aligned_alignment, df2.gene_aligned_alignment,
                 check_names=False)
 
-            
-class test_pacbio_CCS_align_long_codonDMS(test_pacbio_CCS_align_short_codonDMS):
-    """Tests `dms_tools2.pacbio.CCS` and related functions.
-    
-    Data simulates codon-level DMS of a long target."""
-
-    #: length of target sequence
-    TARGET_LEN = 4000
-
-
-class test_pacbio_CCS_align_short_virus_w_del(
-        test_pacbio_CCS_align_short_codonDMS):
-    """Tests `dms_tools2.pacbio.CCS` and related functions.
-    
-    Data simulates short viral sequences with some long deletions."""
-
-    #: options to :py:mod:`dms_tools2.minimap2.Mapper`
-    MAPPER_OPTIONS = dms_tools2.minimap2.OPTIONS_VIRUS_W_DEL
-
-    #: deletion lengths range from 1 to this number.
-    MAX_DEL_LEN = 600
-
-    #: insertion lengths range from 1 to this number.
-    MAX_INS_LEN = 30
-
-    #: minimum spacing between indels and other mutations
-    INDEL_SPACING = 50
-
-    #: each mutation changes this many consecutive nucleotides
-    MUTLEN = 1
-
-    #: no mutations within this distance from termini
-    MUT_BUFFER = 80
-
-
-class test_pacbio_CCS_align_long_virus_w_del(
-        test_pacbio_CCS_align_short_virus_w_del):
-    """Tests `dms_tools2.pacbio.CCS` and related functions.
-
-    Data simulates long viral sequences with some long deletions."""
-
-    #: length of target sequence
-    TARGET_LEN = 4000
-
-    #: deletion lengths range from 1 to this number.
-    MAX_DEL_LEN = 3200
-
-
 
 if __name__ == '__main__':
     runner = unittest.TextTestRunner()